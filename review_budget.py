@@ -49,9 +49,10 @@ def concatenate_transactions(folder_path):
 
 
 # Function to process the transactions with OpenAI API
-def analyze_transactions(api_key, budget, transactions_csv):
-    # Read CSV content
-    transactions_data = pd.read_csv(transactions_csv)
+def analyze_transactions(api_key, budget, transactions_csv, transactions_data=None):
+    # Read CSV content, unless the caller already has it in memory
+    if transactions_data is None:
+        transactions_data = pd.read_csv(transactions_csv)
 
     # Convert to JSON string (or structured text)
     transactions_text = transactions_data.to_string(index=False)
@@ -102,10 +103,10 @@ if __name__ == "__main__":
     openai_api_key = sys.argv[3]
 
     # Get combined transactions file
-    transactions_file, _ = concatenate_transactions(folder_path)
+    transactions_file, combined_df = concatenate_transactions(folder_path)
 
-    # Analyze transactions with OpenAI
-    analysis_result = analyze_transactions(openai_api_key, budget, transactions_file)
+    # Analyze transactions with OpenAI (reuse the combined data instead of re-parsing the file)
+    analysis_result = analyze_transactions(openai_api_key, budget, transactions_file, combined_df)
 
     if analysis_result:
         print("\nFinancial Analysis:")